@@ -5,12 +5,20 @@ Can be run with just Python 3.11+ standard library for bootstrap,
 then enhances itself with better tools when available.
 """
 
+from __future__ import annotations
+
+import atexit
+import io
+import json
 import os
 import re
 import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from operator import attrgetter, itemgetter
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List, Optional
 
 # Debug mode
 DEBUG = os.environ.get("QUICK_CLAUDE_DEBUG", "").lower() in ("1", "true", "yes")
@@ -22,137 +30,96 @@ def debug(msg: str):
         print(f"[DEBUG] {msg}", file=sys.stderr)
 
 
+# Under CI, also fsync atomic writes so a crash cannot lose the rename
+DURABLE_WRITES = os.environ.get("CI", "").lower() in ("1", "true", "yes")
+
+
+@contextmanager
+def atomic_open(path: Path, buffering: int = -1):
+    """Open a sibling temp file for writing and swap it into place on success"""
+    # Write through symlinks and keep the existing file's permissions
+    path = Path(os.path.realpath(path))
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = None
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb", buffering=buffering) as f:
+            yield f
+            if DURABLE_WRITES:
+                f.flush()
+                os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    if DURABLE_WRITES:
+        try:
+            fd = os.open(path.parent, os.O_RDONLY)
+        except OSError:
+            return  # Directories cannot be opened on Windows
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def atomic_write(path: Path, data: bytes):
+    """Write data to a sibling temp file and swap it into place"""
+    with atomic_open(path) as f:
+        f.write(data)
+
+
+def _iter_modules(root: Path):
+    """Yield (category, os.DirEntry) for every .md file below root"""
+    # DirEntry caches stat(), so callers reuse it instead of stat-ing again
+    stack = [str(root)]
+    while stack:
+        dir_path = stack.pop()
+        category = os.path.basename(dir_path)
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".md") and entry.is_file():
+                        yield category, entry
+        except FileNotFoundError:
+            continue
+
+
 # Constants
 VERSION = "1.1.0"
 MODULE_DIR = Path(".claude/modules")
 CLAUDE_MD = Path("CLAUDE.md")
 CONFIG_FILE = Path(".claude/config.yaml")
+CONFIG_CACHE = Path(".claude/config.json")
+COMPILE_CACHE = Path(".claude/.compile-cache.json")
+FRONTMATTER_CACHE = Path(".claude/.frontmatter-cache.json")
+FRONTMATTER_CACHE_SIZE = 1024
 MODULES_REPO = "https://raw.githubusercontent.com/mjbommar/quick-claude/master/modules"
 
+# Matches top-level active: lines inside a module's frontmatter (not nested keys)
+_ACTIVE_RE = re.compile(rb"^active[ \t]*:[^\r\n]*", re.MULTILINE)
+_ACTIVE_LINES = {True: b"active: true", False: b"active: false"}
 
-class SimpleModuleManager:
-    """Minimal module manager that works with stdlib only"""
-
-    def __init__(self):
-        debug("SimpleModuleManager.__init__() called")
-        self.modules = {}
-        self.config = self.load_config()
-        debug(f"Config loaded: {self.config}")
-
-    def load_config(self) -> dict:
-        """Load or create default config"""
-        if CONFIG_FILE.exists():
-            # Simple YAML parsing for bootstrap
-            config = {}
-            with open(CONFIG_FILE) as f:
-                for line in f:
-                    if ":" in line and not line.strip().startswith("#"):
-                        key, val = line.split(":", 1)
-                        config[key.strip()] = val.strip()
-            return config
-        return {"auto_compile": "true", "max_size": "5000", "project_type": "auto"}
-
-    def init(self, auto_compile=True, download=True):
-        """Initialize Claude module system"""
-        debug("Starting init()")
-        print("🚀 Initializing Claude Module System...")
-
-        # Create directory structure
-        dirs = [
-            ".claude/modules/task",
-            ".claude/modules/tech",
-            ".claude/modules/behavior",
-            ".claude/modules/context",
-            ".claude/modules/memory",
-        ]
-
-        debug(f"Creating {len(dirs)} directories")
-        for dir_path in dirs:
-            Path(dir_path).mkdir(parents=True, exist_ok=True)
-            debug(f"Created {dir_path}")
-
-        # Create default config
-        if not CONFIG_FILE.exists():
-            CONFIG_FILE.parent.mkdir(parents=True, exist_ok=True)
-            CONFIG_FILE.write_text("""# Claude Module System Configuration
-auto_compile: true
-max_size: 5000
-project_type: auto
-""")
-
-        # Download essential modules
-        if download:
-            self.download_essential_modules()
-
-        print("✅ Claude module system initialized!")
-
-        # Auto-compile if requested
-        if auto_compile:
-            print("\n📦 Compiling initial CLAUDE.md...")
-            self.compile()
-        else:
-            print("\nNext steps:")
-            print("  1. Run 'python cm.py compile' to generate CLAUDE.md")
-            print("  2. Run 'python cm.py list' to see available modules")
-            print("  3. Add custom modules to .claude/modules/")
-
-    def download_essential_modules(self):
-        """Download essential modules from repository"""
-        debug("Starting download_essential_modules()")
-        essential_modules = [
-            ("context", "base-instructions"),
-            ("context", "claude-md-management"),
-            ("context", "production-mindset"),
-            ("context", "project-structure"),
-            ("behavior", "test-driven-development"),
-            ("behavior", "self-improvement"),
-            ("behavior", "proactive-todo-usage"),
-            ("behavior", "flow-state"),
-            ("task", "todo-management"),
-            ("tech", "python-modern"),
-            ("tech", "node-typescript"),
-        ]
-
-        for category, module_name in essential_modules:
-            module_path = MODULE_DIR / category / f"{module_name}.md"
-            debug(f"Checking {module_path}")
-            if not module_path.exists():
-                # Try to download from repo, fallback to creating default
-                try:
-                    import urllib.request
-                    import urllib.error
-
-                    url = f"{MODULES_REPO}/{category}/{module_name}.md"
-                    debug(f"Downloading from {url}")
-                    response = urllib.request.urlopen(url, timeout=3)
-                    content = response.read().decode("utf-8")
-                    module_path.parent.mkdir(parents=True, exist_ok=True)
-                    module_path.write_text(content)
-                    print(f"  ✓ Downloaded {category}/{module_name}")
-                except (
-                    urllib.error.URLError,
-                    urllib.error.HTTPError,
-                    TimeoutError,
-                ) as e:
-                    # Fallback to creating default module
-                    debug(f"Download failed for {category}/{module_name}: {e}")
-                    print(
-                        f"  ⚠ Could not download {category}/{module_name} (using default)"
-                    )
-                    self.create_default_module(module_path, module_name, category)
-                except Exception as e:
-                    debug(f"Unexpected error for {category}/{module_name}: {e}")
-                    print(f"  ⚠ Error with {category}/{module_name}: {e}")
-                    self.create_default_module(module_path, module_name, category)
-            else:
-                debug(f"Module already exists: {module_path}")
+# Frontmatter block (up to the closing --- or end of text) and its key: value lines
+_FRONTMATTER_RE = re.compile(
+    r"\A---[^\n]*\n(.*?)(?:^[ \t]*---[ \t]*\r?$|\Z)", re.DOTALL | re.MULTILINE
+)
+# Closing --- line of a frontmatter block in raw bytes (the line is exactly ---)
+_CLOSING_RE = re.compile(rb"\n[ \t]*---[ \t\r]*(?:\n|\Z)")
+_PARTIAL_CLOSING_RE = re.compile(rb"\n[ \t]*(?:---[ \t\r]*|-{0,2})\Z")
+_KV_RE = re.compile(r"^[ \t]*([^:\n]*?)[ \t]*:[ \t]*(.*?)[ \t\r]*$", re.MULTILINE)
+_BOOLEANS = {"true": True, "yes": True, "false": False, "no": False}
 
-    def create_default_module(self, path: Path, name: str, category: str):
-        """Create a default module file"""
-        path.parent.mkdir(parents=True, exist_ok=True)
 
-        if name == "base-instructions":
-            content = """---
+# Bundled fallbacks used when an essential module cannot be downloaded
+_DEFAULT_MODULES: dict[str, bytes] = {
+    "base-instructions": """---
 id: base-instructions
 name: Base Instructions
 category: context
@@ -169,9 +136,8 @@ You are Claude, an AI assistant created by Anthropic.
 - Follow user instructions precisely
 - Maintain context awareness
 - Use modern development practices
-"""
-        elif name == "project-structure":
-            content = """---
+""".encode(),
+    "project-structure": """---
 id: project-structure
 name: Project Structure
 category: context
@@ -186,9 +152,8 @@ Maintain clean project structure:
 - Keep CLAUDE.md updated
 - Document decisions in log.md
 - Track tasks in todo/
-"""
-        elif name == "flow-state":
-            content = """---
+""".encode(),
+    "flow-state": """---
 id: flow-state
 name: Flow State Mode
 category: behavior
@@ -200,9 +165,8 @@ active: false
 
 When activated, prioritize uninterrupted progress.
 Make reasonable assumptions and batch operations.
-"""
-        elif name == "test-driven-development":
-            content = """---
+""".encode(),
+    "test-driven-development": """---
 id: test-driven-development
 name: Test-Driven Development
 category: behavior
@@ -220,9 +184,8 @@ Always write tests before implementation:
 3. Refactor
 
 Use `uvx pytest` for testing.
-"""
-        elif name == "production-mindset":
-            content = """---
+""".encode(),
+    "production-mindset": """---
 id: production-mindset
 name: Production Mindset
 category: context
@@ -236,9 +199,8 @@ This is REAL code for REAL users.
 - Never mock without permission
 - Always validate thoroughly
 - Consider security and performance
-"""
-        elif name == "self-improvement":
-            content = """---
+""".encode(),
+    "self-improvement": """---
 id: self-improvement
 name: Self-Improvement
 category: behavior
@@ -252,9 +214,8 @@ Learn from each task:
 - Document in log.md
 - Recognize patterns
 - Improve approach
-"""
-        elif name == "claude-md-management":
-            content = """---
+""".encode(),
+    "claude-md-management": """---
 id: claude-md-management
 name: CLAUDE.md Management
 category: context
@@ -275,9 +236,8 @@ Commands:
 - python cm.py activate <module>
 - python cm.py deactivate <module>
 - python cm.py compile
-"""
-        elif name == "todo-management":
-            content = """---
+""".encode(),
+    "todo-management": """---
 id: todo-management
 name: Todo Management
 category: task
@@ -294,9 +254,8 @@ active: true
 - Mark as `in_progress` when starting
 - Mark as `completed` immediately when done
 - Only one task `in_progress` at a time
-"""
-        elif name == "proactive-todo-usage":
-            content = """---
+""".encode(),
+    "proactive-todo-usage": """---
 id: proactive-todo-usage
 name: Proactive Todo Usage
 category: behavior
@@ -313,9 +272,8 @@ Use TodoWrite for ANY non-trivial task.
 - User provides multiple requests
 - Implementing a feature
 - Fixing multiple bugs
-"""
-        elif name == "python-modern":
-            content = """---
+""".encode(),
+    "python-modern": """---
 id: python-modern
 name: Modern Python Development
 category: tech
@@ -334,217 +292,672 @@ active: false
 - Type check: `uvx mypy <files>`
 - Format: `uvx ruff format <files>`
 - Lint: `uvx ruff check --fix <files>`
-"""
-        else:
-            content = f"""---
+""".encode(),
+}
+
+
+# Placeholder for module names without a bundled default
+_DEFAULT_TEMPLATE = """---
 id: {name}
-name: {name.replace("-", " ").title()}
+name: {title}
 category: {category}
 priority: 5
 active: false
 ---
 
-# {name.replace("-", " ").title()}
+# {title}
 
 Module content here.
 """
 
-        path.write_text(content)
+
+class _Module:
+    """Compact record for one active module during compile"""
+
+    __slots__ = ("path", "body", "metadata", "priority", "sort_name")
+
+    def __init__(self, path: Path, body: str, metadata: dict):
+        self.path = path
+        self.body = body
+        self.metadata = metadata
+        self.priority = int(metadata.get("priority", 5))
+        self.sort_name = metadata.get("name", "")
+
+
+class SimpleModuleManager:
+    """Minimal module manager that works with stdlib only"""
+
+    def __init__(self):
+        debug("SimpleModuleManager.__init__() called")
+        self.modules = {}
+        self.config = self.load_config()
+        debug(f"Config loaded: {self.config}")
+        self._fm_cache = self.load_frontmatter_cache()
+        self._fm_dirty = False
+        self._cache_lock = threading.Lock()
+        self._root_names: set[str] | None = None
+        self._ensured_dirs: set[Path] = set()
+        atexit.register(self.save_frontmatter_cache)
+
+    def _ensure_dir(self, path: Path):
+        """Create a directory once per run, skipping repeat mkdir calls"""
+        if path not in self._ensured_dirs:
+            path.mkdir(parents=True, exist_ok=True)
+            self._ensured_dirs.add(path)
+
+    def load_config(self) -> dict:
+        """Load or create default config"""
+        try:
+            yaml_stat = CONFIG_FILE.stat()
+        except FileNotFoundError:
+            return {"auto_compile": "true", "max_size": "5000", "project_type": "auto"}
+
+        # Reuse the JSON cache while the YAML keeps the mtime and size it was built from
+        try:
+            with open(CONFIG_CACHE) as f:
+                cached = json.load(f)
+            if (
+                isinstance(cached, dict)
+                and cached.get("mtime_ns") == yaml_stat.st_mtime_ns
+                and cached.get("size") == yaml_stat.st_size
+                and isinstance(cached.get("config"), dict)
+            ):
+                debug(f"Config loaded from cache {CONFIG_CACHE}")
+                return cached["config"]
+        except (OSError, ValueError) as e:
+            debug(f"Config cache unavailable: {e}")
+
+        config = self.parse_config()
+        cached = {
+            "mtime_ns": yaml_stat.st_mtime_ns,
+            "size": yaml_stat.st_size,
+            "config": config,
+        }
+        try:
+            atomic_write(CONFIG_CACHE, json.dumps(cached, default=str).encode())
+        except (OSError, TypeError, ValueError) as e:
+            # Non-string YAML keys (dates, numbers) cannot be stored as JSON
+            debug(f"Could not write config cache: {e}")
+        return config
+
+    def reload_config(self) -> dict:
+        """Drop memoized config and project detection, then load config again"""
+        self.config = self.load_config()
+        self._root_names = None
+        debug(f"Config reloaded: {self.config}")
+        return self.config
+
+    def parse_config(self) -> dict:
+        """Parse config.yaml with PyYAML if available, else a simple parser"""
+        # PyYAML is optional and slow to import, so only load it on a cache miss
+        try:
+            import yaml
+        except ImportError:
+            yaml = None
+
+        if yaml is not None:
+            # Prefer the libyaml-backed loader when it is compiled in
+            loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+            try:
+                with open(CONFIG_FILE) as f:
+                    config = yaml.load(f, Loader=loader)
+                return config if isinstance(config, dict) else {}
+            except yaml.YAMLError as e:
+                debug(f"YAML parse failed, using simple parser: {e}")
+
+        # Simple YAML parsing for bootstrap
+        config = {}
+        with open(CONFIG_FILE) as f:
+            for line in f:
+                if ":" in line and not line.strip().startswith("#"):
+                    key, val = line.split(":", 1)
+                    config[key.strip()] = val.strip()
+        return config
+
+    def init(self, auto_compile=True, download=True):
+        """Initialize Claude module system"""
+        debug("Starting init()")
+        print("🚀 Initializing Claude Module System...")
+
+        # Create directory structure
+        dirs = [
+            ".claude/modules/task",
+            ".claude/modules/tech",
+            ".claude/modules/behavior",
+            ".claude/modules/context",
+            ".claude/modules/memory",
+        ]
+
+        debug(f"Creating {len(dirs)} directories")
+        for dir_path in dirs:
+            self._ensure_dir(Path(dir_path))
+            debug(f"Created {dir_path}")
+
+        # Create default config
+        if not CONFIG_FILE.exists():
+            self._ensure_dir(CONFIG_FILE.parent)
+            CONFIG_FILE.write_text("""# Claude Module System Configuration
+auto_compile: true
+max_size: 5000
+project_type: auto
+""")
+            self.reload_config()
+
+        # Download essential modules
+        if download:
+            self.download_essential_modules()
+
+        print("✅ Claude module system initialized!")
+
+        # Auto-compile if requested
+        if auto_compile:
+            print("\n📦 Compiling initial CLAUDE.md...")
+            self.compile()
+        else:
+            print("\nNext steps:")
+            print("  1. Run 'python cm.py compile' to generate CLAUDE.md")
+            print("  2. Run 'python cm.py list' to see available modules")
+            print("  3. Add custom modules to .claude/modules/")
+
+    def download_essential_modules(self):
+        """Download essential modules from repository"""
+        debug("Starting download_essential_modules()")
+        essential_modules = [
+            ("context", "base-instructions"),
+            ("context", "claude-md-management"),
+            ("context", "production-mindset"),
+            ("context", "project-structure"),
+            ("behavior", "test-driven-development"),
+            ("behavior", "self-improvement"),
+            ("behavior", "proactive-todo-usage"),
+            ("behavior", "flow-state"),
+            ("task", "todo-management"),
+            ("tech", "python-modern"),
+            ("tech", "node-typescript"),
+        ]
+
+        tasks = []
+        for category, module_name in essential_modules:
+            module_path = MODULE_DIR / category / f"{module_name}.md"
+            debug(f"Checking {module_path}")
+            if module_path.exists():
+                debug(f"Module already exists: {module_path}")
+                continue
+            url = f"{MODULES_REPO}/{category}/{module_name}.md"
+            tasks.append((category, module_name, url, module_path))
+
+        if not tasks:
+            return
+
+        import base64
+        import http.client
+        import shutil
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        from urllib.parse import unquote, urlsplit
+        from urllib.request import getproxies, proxy_bypass
+
+        # One keep-alive connection per worker thread, reused across modules
+        repo = urlsplit(MODULES_REPO)
+        connection_class = (
+            http.client.HTTPSConnection
+            if repo.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        proxy = getproxies().get(repo.scheme)
+        proxy_headers = {}
+        if proxy and proxy_bypass(repo.hostname):
+            proxy = None
+        if proxy:
+            proxy_url = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+            proxy_port = proxy_url.port or (443 if proxy_url.scheme == "https" else 80)
+            if proxy_url.username is not None:
+                user = unquote(proxy_url.username)
+                credentials = f"{user}:{unquote(proxy_url.password or '')}"
+                token = base64.b64encode(credentials.encode()).decode("ascii")
+                proxy_headers["Proxy-Authorization"] = f"Basic {token}"
+        local = threading.local()
+        connections = []
+
+        def connection() -> http.client.HTTPConnection:
+            conn = getattr(local, "conn", None)
+            if conn is None:
+                if proxy:
+                    conn = connection_class(proxy_url.hostname, proxy_port, timeout=3)
+                    conn.set_tunnel(repo.hostname, repo.port, headers=proxy_headers)
+                else:
+                    conn = connection_class(repo.hostname, repo.port, timeout=3)
+                local.conn = conn
+                connections.append(conn)
+            return conn
+
+        def fetch(url: str, module_path: Path):
+            debug(f"Downloading from {url}")
+            conn = connection()
+            request_path = urlsplit(url).path
+            try:
+                conn.request("GET", request_path)
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError):
+                # The server dropped the idle connection; reconnect once
+                conn.close()
+                conn.request("GET", request_path)
+                response = conn.getresponse()
+            if response.status != 200:
+                response.read()
+                raise http.client.HTTPException(
+                    f"HTTP {response.status} {response.reason}"
+                )
+
+            # Stream the body to disk; only swap it in once complete
+            try:
+                with atomic_open(module_path) as out:
+                    shutil.copyfileobj(response, out, 64 * 1024)
+                    # read(amt) returns b"" if the peer closes before Content-Length
+                    if response.length:
+                        raise http.client.IncompleteRead(b"", response.length)
+            except BaseException:
+                conn.close()
+                raise
+
+        print_lock = threading.Lock()
+
+        def fetch_one(category: str, module_name: str, url: str, module_path: Path):
+            # Try to download from repo, fallback to creating default
+            try:
+                fetch(url, module_path)
+                with print_lock:
+                    print(f"  ✓ Downloaded {category}/{module_name}")
+            except (OSError, http.client.HTTPException) as e:
+                # Fallback to creating default module
+                debug(f"Download failed for {category}/{module_name}: {e}")
+                with print_lock:
+                    print(
+                        f"  ⚠ Could not download {category}/{module_name} (using default)"
+                    )
+                    self.create_default_module(module_path, module_name, category)
+            except Exception as e:
+                debug(f"Unexpected error for {category}/{module_name}: {e}")
+                with print_lock:
+                    print(f"  ⚠ Error with {category}/{module_name}: {e}")
+                    self.create_default_module(module_path, module_name, category)
+
+        for *_, module_path in tasks:
+            self._ensure_dir(module_path.parent)
+
+        # Downloads are independent, so total time approaches the slowest one
+        try:
+            with ThreadPoolExecutor(max_workers=min(8, len(tasks))) as executor:
+                futures = [executor.submit(fetch_one, *task) for task in tasks]
+                for future in as_completed(futures):
+                    future.result()
+        finally:
+            for conn in connections:
+                conn.close()
+
+    def create_default_module(self, path: Path, name: str, category: str):
+        """Create a default module file"""
+        self._ensure_dir(path.parent)
+
+        data = _DEFAULT_MODULES.get(name)
+        if data is None:
+            data = _DEFAULT_TEMPLATE.format(
+                name=name, title=name.replace("-", " ").title(), category=category
+            ).encode()
+        path.write_bytes(data)
         print(f"  ✓ Created {category}/{name}")
 
-    def compile(self, output_file: str = "CLAUDE.md"):
+    def module_fingerprint(self, entries: list[os.DirEntry]) -> str:
+        """Hash the (path, mtime, size) of every module file"""
+        import hashlib
+
+        stats = []
+        for entry in entries:
+            st = entry.stat()
+            stats.append((entry.path, st.st_mtime_ns, st.st_size))
+
+        digest = hashlib.blake2b(VERSION.encode(), digest_size=16)
+        for path, mtime_ns, size in sorted(stats):
+            digest.update(f"{path}\0{mtime_ns}\0{size}\n".encode())
+        return digest.hexdigest()
+
+    def load_compile_cache(self) -> dict:
+        """Load the compile fingerprint cache"""
+        try:
+            with open(COMPILE_CACHE) as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save_compile_cache(self, cache: dict):
+        """Atomically write the compile fingerprint cache"""
+        # Caching must not create .claude in a project that was never initialized
+        if not COMPILE_CACHE.parent.is_dir():
+            return
+        try:
+            atomic_write(COMPILE_CACHE, json.dumps(cache).encode())
+        except OSError as e:
+            debug(f"Could not write compile cache: {e}")
+
+    def compile(self, output_file: str = "CLAUDE.md", force: bool = False):
         """Compile modules into the specified output file."""
         print(f"📦 Compiling {output_file}...")
 
+        # Skip the rebuild when no module changed since the last compile
+        entries = [entry for _, entry in _iter_modules(MODULE_DIR)]
+        fingerprint = self.module_fingerprint(entries)
+        cache = self.load_compile_cache()
+        cached = cache.get(output_file)
+        if (
+            not force
+            and isinstance(cached, dict)
+            and cached.get("fingerprint") == fingerprint
+        ):
+            # Any edit to the output since we wrote it forces a rebuild
+            try:
+                st = Path(output_file).stat()
+                output_unchanged = (
+                    st.st_mtime_ns == cached.get("mtime_ns")
+                    and st.st_size == cached.get("size")
+                )
+            except FileNotFoundError:
+                output_unchanged = False
+            if output_unchanged:
+                debug(f"Compile cache hit for {output_file}")
+                print(
+                    f"✅ {output_file} is up to date ({cached.get('modules', 0)} modules)"
+                )
+                return
+
         # Load all active modules
         all_modules = []
-        if MODULE_DIR.exists():
-            for module_file in MODULE_DIR.rglob("*.md"):
-                content = module_file.read_text()
-                if content.strip():
-                    metadata = self.parse_frontmatter(content)
-                    if metadata.get("active", True):
-                        all_modules.append(
-                            {
-                                "path": module_file,
-                                "content": content,
-                                "metadata": metadata,
-                                "priority": int(metadata.get("priority", 5)),
-                            }
-                        )
-
-        all_modules.sort(key=lambda x: x["priority"], reverse=True)
-
-        output_content = ""
+        if len(entries) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            # File reads release the GIL, so threads overlap the I/O
+            workers = min(len(entries), os.cpu_count() or 4)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(self._load_module, entries))
+        else:
+            # A single file is cheaper to load without a pool
+            results = [self._load_module(entry) for entry in entries]
+
+        for entry, (metadata, body) in zip(entries, results):
+            # Skip inactive modules and files that are entirely empty
+            if body is not None and (body or metadata):
+                all_modules.append(_Module(Path(entry.path), body, metadata))
+
+        all_modules.sort(key=attrgetter("priority"), reverse=True)
+
+        # Stream sections straight into the temp file behind a large buffer
+        output_path = Path(output_file)
         filename_upper = output_file.upper()
-        if "GEMINI.MD" in filename_upper:
-            output_content = self.generate_gemini_md(all_modules)
-        elif "AGENTS.MD" in filename_upper:
-            output_content = self.generate_agents_md(all_modules)
-        else:  # Default to CLAUDE.md
-            output_content = self.generate_claude_md(all_modules)
-
-        Path(output_file).write_text(output_content)
+        with atomic_open(output_path, buffering=1 << 20) as out:
+            if "GEMINI.MD" in filename_upper:
+                self.generate_gemini_md(out, all_modules)
+            elif "AGENTS.MD" in filename_upper:
+                self.generate_agents_md(out, all_modules)
+            else:  # Default to CLAUDE.md
+                self.generate_claude_md(out, all_modules)
+        output_stat = output_path.stat()
+        cache[output_file] = {
+            "fingerprint": fingerprint,
+            "mtime_ns": output_stat.st_mtime_ns,
+            "size": output_stat.st_size,
+            "modules": len(all_modules),
+        }
+        self.save_compile_cache(cache)
         print(f"✅ Compiled {len(all_modules)} modules into {output_file}")
 
-    def generate_claude_md(self, all_modules: List[Dict]) -> str:
-        """Generates content for CLAUDE.md"""
-        output = [
-            "# CLAUDE.md - Project Context",
-            f"Generated: {datetime.now().isoformat()}",
-            f"Active Modules: {len(all_modules)}",
-            "",
-            "**This file is auto-generated**. To update, edit modules in `.claude/modules/` and run `python cm.py compile`.",
-            "",
-            "---",
-            "",
-        ]
-
-        # Table of Contents
-        output.append("## 📚 Table of Contents")
+    def group_by_category(self, all_modules: list[_Module]) -> dict[str, list[_Module]]:
+        """Group modules by their metadata category"""
         modules_by_category = {}
         for module in all_modules:
-            category = module["metadata"].get("category", "uncategorized")
+            category = module.metadata.get("category", "uncategorized")
             if category not in modules_by_category:
                 modules_by_category[category] = []
             modules_by_category[category].append(module)
+        return modules_by_category
+
+    def generate_claude_md(self, out: io.BufferedIOBase, all_modules: list[_Module]):
+        """Writes CLAUDE.md content into out"""
+        out.write(
+            (
+                "# CLAUDE.md - Project Context\n"
+                f"Generated: {time.strftime('%Y-%m-%dT%H:%M:%S')}\n"
+                f"Active Modules: {len(all_modules)}\n"
+                "\n"
+                "**This file is auto-generated**. To update, edit modules in `.claude/modules/` and run `python cm.py compile`.\n"
+                "\n"
+                "---\n"
+                "\n"
+            ).encode()
+        )
 
+        # Table of Contents
+        out.write("## 📚 Table of Contents\n".encode())
+        modules_by_category = self.group_by_category(all_modules)
         for category, modules in sorted(modules_by_category.items()):
-            output.append(f"- **{category.upper()}**")
-            for module in sorted(modules, key=lambda x: x["metadata"].get("name", "")):
-                module_name = module["metadata"].get("name", module["path"].stem)
-                output.append(
-                    f"  - [{module_name}](#{module['metadata'].get('id', '')})"
+            out.write(f"- **{category.upper()}**\n".encode())
+            for module in sorted(modules, key=attrgetter("sort_name")):
+                module_name = module.metadata.get("name", module.path.stem)
+                out.write(
+                    f"  - [{module_name}](#{module.metadata.get('id', '')})\n".encode()
                 )
-        output.append("\n---\n")
+        out.write(b"\n---\n\n")
 
-        # Add modules
+        # Add modules, one write per module section
         for module in all_modules:
-            content = module["content"]
-            if content.startswith("---"):
-                parts = content.split("---", 2)
-                if len(parts) >= 3:
-                    content = parts[2].strip()
-
-            module_name = module["metadata"].get("name", module["path"].stem)
-            module_id = module["metadata"].get(
+            module_name = module.metadata.get("name", module.path.stem)
+            module_id = module.metadata.get(
                 "id", module_name.lower().replace(" ", "-")
             )
 
-            output.append(f'## <a id="{module_id}"></a>📦 {module_name}')
             try:
-                relative_path = module["path"].relative_to(Path.cwd())
+                relative_path = module.path.relative_to(Path.cwd())
             except ValueError:
                 # If path is already relative or can't be made relative, use as is
-                relative_path = module["path"]
-            output.append(f"> `{relative_path}`")
-            output.append("")
-            output.append(content)
-            output.append("\n---\n")
-
-        return "\n".join(output)
-
-    def generate_gemini_md(self, all_modules: List[Dict]) -> str:
-        """Generates content for GEMINI.md"""
-        output = [
-            "# GEMINI.md - Project Directives",
-            "## Core Mission: [Please define project goal]",
-            "",
-            "This document provides instructions for the Gemini agent working on this project.",
-            "---",
-            "## Core Directives & Rules",
-            "",
-        ]
+                relative_path = module.path
+            out.write(
+                (
+                    f'## <a id="{module_id}"></a>📦 {module_name}\n'
+                    f"> `{relative_path}`\n\n"
+                    f"{module.body}\n\n---\n\n"
+                ).encode()
+            )
+
+    def generate_gemini_md(self, out: io.BufferedIOBase, all_modules: list[_Module]):
+        """Writes GEMINI.md content into out"""
+        out.write(
+            (
+                "# GEMINI.md - Project Directives\n"
+                "## Core Mission: [Please define project goal]\n"
+                "\n"
+                "This document provides instructions for the Gemini agent working on this project.\n"
+                "---\n"
+                "## Core Directives & Rules\n"
+                "\n"
+            ).encode()
+        )
         # Re-use agents.md logic for the body
-        output.append(self.generate_agents_md(all_modules, is_child=True))
-        return "\n".join(output)
+        self.generate_agents_md(out, all_modules, is_child=True)
 
     def generate_agents_md(
-        self, all_modules: List[Dict], is_child: bool = False
-    ) -> str:
-        """Generates content for AGENTS.md"""
-        header = [
-            "# AGENTS.md - Instructions for AI Agents",
-            f"Generated: {datetime.now().isoformat()}",
-            "",
-            "This document provides instructions for AI agents working on this project.",
-            "",
-            "---",
-        ]
-        if is_child:
-            header = []
-
-        output = list(header)
+        self, out: io.BufferedIOBase, all_modules: list[_Module], is_child: bool = False
+    ):
+        """Writes AGENTS.md content into out"""
+        if not is_child:
+            out.write(
+                (
+                    "# AGENTS.md - Instructions for AI Agents\n"
+                    f"Generated: {time.strftime('%Y-%m-%dT%H:%M:%S')}\n"
+                    "\n"
+                    "This document provides instructions for AI agents working on this project.\n"
+                    "\n"
+                    "---\n"
+                ).encode()
+            )
 
         # Table of Contents
-        output.append("## Table of Contents")
-        modules_by_category = {}
-        for module in all_modules:
-            category = module["metadata"].get("category", "uncategorized")
-            if category not in modules_by_category:
-                modules_by_category[category] = []
-            modules_by_category[category].append(module)
-
+        out.write(b"## Table of Contents\n")
+        modules_by_category = self.group_by_category(all_modules)
         for category, modules in sorted(modules_by_category.items()):
-            output.append(f"- **{category.upper()}**")
-            for module in sorted(modules, key=lambda x: x["metadata"].get("name", "")):
-                module_name = module["metadata"].get("name", module["path"].stem)
-                module_id = module["metadata"].get(
+            out.write(f"- **{category.upper()}**\n".encode())
+            for module in sorted(modules, key=attrgetter("sort_name")):
+                module_name = module.metadata.get("name", module.path.stem)
+                module_id = module.metadata.get(
                     "id", module_name.lower().replace(" ", "-")
                 )
-                output.append(f"  - [{module_name}](#{module_id})")
-        output.append("\n---\n")
+                out.write(f"  - [{module_name}](#{module_id})\n".encode())
+        out.write(b"\n---\n\n")
 
-        # Add modules
+        # Add modules, one write per module section
         for module in all_modules:
-            content = module["content"]
-            if content.startswith("---"):
-                parts = content.split("---", 2)
-                if len(parts) >= 3:
-                    content = parts[2].strip()
-
-            module_name = module["metadata"].get("name", module["path"].stem)
-            module_id = module["metadata"].get(
+            module_name = module.metadata.get("name", module.path.stem)
+            module_id = module.metadata.get(
                 "id", module_name.lower().replace(" ", "-")
             )
 
-            output.append(f'<a id="{module_id}"></a>')
-            output.append(f"## {module_name}")
-            output.append("")
-            output.append(content)
-            output.append("\n---\n")
-
-        return "\n".join(output)
-
-    def parse_frontmatter(self, content: str) -> dict:
-        """Simple frontmatter parser"""
-        metadata = {}
-        if content.startswith("---"):
-            lines = content.split("\n")
-            for line in lines[1:]:
-                if line.strip() == "---":
-                    break
-                if ":" in line:
-                    key, val = line.split(":", 1)
-                    key = key.strip()
-                    val = val.strip()
-                    # Handle booleans
-                    if val.lower() in ("true", "yes"):
-                        val = True
-                    elif val.lower() in ("false", "no"):
-                        val = False
-                    metadata[key] = val
-        return metadata
-
-    def detect_project_type(self) -> Optional[str]:
+            out.write(
+                (
+                    f'<a id="{module_id}"></a>\n## {module_name}\n\n'
+                    f"{module.body}\n\n---\n\n"
+                ).encode()
+            )
+
+    def parse_frontmatter(self, content: str) -> tuple[dict, int]:
+        """Simple frontmatter parser; also returns where the body starts"""
+        match = _FRONTMATTER_RE.match(content)
+        if not match:
+            return {}, 0
+        # Handle booleans
+        metadata = {
+            key: _BOOLEANS.get(val.lower(), val)
+            for key, val in _KV_RE.findall(match.group(1))
+        }
+        # Without a closing --- the whole text is treated as body
+        body_start = match.end() if match.end(1) < match.end() else 0
+        return metadata, body_start
+
+    def load_frontmatter_cache(self) -> OrderedDict:
+        """Load parsed frontmatter cached by previous runs"""
+        try:
+            with open(FRONTMATTER_CACHE) as f:
+                cache = json.load(f)
+            if isinstance(cache, dict):
+                # Drop malformed entries; they just become cache misses
+                return OrderedDict(
+                    (key, entry)
+                    for key, entry in cache.items()
+                    if isinstance(entry, dict) and isinstance(entry.get("meta"), dict)
+                )
+        except (OSError, ValueError):
+            pass
+        return OrderedDict()
+
+    def save_frontmatter_cache(self):
+        """Atomically write the frontmatter cache if it changed"""
+        if not self._fm_dirty:
+            return
+        try:
+            atomic_write(FRONTMATTER_CACHE, json.dumps(self._fm_cache).encode())
+            self._fm_dirty = False
+        except OSError as e:
+            debug(f"Could not write frontmatter cache: {e}")
+
+    def read_frontmatter_only(self, path: str | Path) -> str:
+        """Read just the leading ---...--- block of a module file"""
+        with open(path, "rb") as f:
+            data = f.read(4096)
+            if not data.startswith(b"---"):
+                return ""
+            data = bytearray(data)
+            start, eof = 3, False
+            while True:
+                match = _CLOSING_RE.search(data, start)
+                # A match at the end of the buffer may continue in the next chunk
+                if match and (eof or match.group().endswith(b"\n")):
+                    return data[: match.end()].decode("utf-8")
+                if eof:
+                    return data.decode("utf-8")
+                # Only a partial closing line can straddle the chunk boundary
+                newline = data.rfind(b"\n", start)
+                if newline == -1 or not _PARTIAL_CLOSING_RE.match(data, newline):
+                    newline = len(data)
+                start = newline
+                chunk = f.read(4096)
+                eof = not chunk
+                data += chunk
+
+    def parse_frontmatter_cached(
+        self, path: str | Path, st: os.stat_result | None = None
+    ) -> tuple[dict, int]:
+        """Parse frontmatter, reusing the cached result while the file is unchanged
+
+        Returns the metadata and the byte offset where the module body starts.
+        """
+        key = str(path)
+        if st is None:
+            st = os.stat(path)
+        with self._cache_lock:
+            entry = self._fm_cache.get(key)
+            # The inode catches files replaced by an atomic rename
+            if (
+                entry
+                and entry.get("mtime_ns") == st.st_mtime_ns
+                and entry.get("size") == st.st_size
+                and entry.get("ino") == st.st_ino
+                and isinstance(entry.get("body_start"), int)
+            ):
+                self._fm_cache.move_to_end(key)
+                return entry["meta"], entry["body_start"]
+
+        header = self.read_frontmatter_only(path)
+        metadata, body_start = self.parse_frontmatter(header)
+        # The header is a decoded prefix of the file, so re-encode for a byte offset
+        body_start = len(header[:body_start].encode("utf-8"))
+        with self._cache_lock:
+            self._fm_cache[key] = {
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "ino": st.st_ino,
+                "meta": metadata,
+                "body_start": body_start,
+            }
+            self._fm_cache.move_to_end(key)
+            while len(self._fm_cache) > FRONTMATTER_CACHE_SIZE:
+                self._fm_cache.popitem(last=False)
+            self._fm_dirty = True
+        return metadata, body_start
+
+    def _load_module(self, entry: os.DirEntry) -> tuple[dict, str | None]:
+        """Return (metadata, body) for a module; body is None if inactive"""
+        path = entry.path
+        metadata, body_start = self.parse_frontmatter_cached(path, entry.stat())
+        body = None
+        if metadata.get("active", True):
+            # Read only past the frontmatter; normalize newlines like text mode
+            with open(path, "rb") as f:
+                f.seek(body_start)
+                body = f.read().decode("utf-8")
+            body = body.replace("\r\n", "\n").replace("\r", "\n").strip()
+        return metadata, body
+
+    def detect_project_type(self) -> str | None:
         """Detect project type from files"""
-        if Path("package.json").exists():
+        # One directory read, reused for the rest of the run
+        if self._root_names is None:
+            with os.scandir(".") as it:
+                self._root_names = {entry.name for entry in it}
+        names = self._root_names
+
+        if "package.json" in names:
             return "node"
-        elif Path("pyproject.toml").exists() or Path("requirements.txt").exists():
+        elif "pyproject.toml" in names or "requirements.txt" in names:
             return "python"
-        elif Path("Cargo.toml").exists():
+        elif "Cargo.toml" in names:
             return "rust"
-        elif Path("go.mod").exists():
+        elif "go.mod" in names:
             return "go"
         return None
 
@@ -557,16 +970,14 @@ Module content here.
             return
 
         modules_by_category = {}
-        for module_file in MODULE_DIR.rglob("*.md"):
-            category = module_file.parent.name
+        for category, entry in _iter_modules(MODULE_DIR):
             if category not in modules_by_category:
                 modules_by_category[category] = []
 
-            content = module_file.read_text()
-            metadata = self.parse_frontmatter(content)
+            metadata, _ = self.parse_frontmatter_cached(entry.path, entry.stat())
             modules_by_category[category].append(
                 {
-                    "name": module_file.stem,
+                    "name": entry.name[:-3],
                     "active": metadata.get("active", False),
                     "priority": metadata.get("priority", 5),
                 }
@@ -574,7 +985,7 @@ Module content here.
 
         for category, modules in sorted(modules_by_category.items()):
             print(f"  {category.upper()}:")
-            for module in sorted(modules, key=lambda x: x["name"]):
+            for module in sorted(modules, key=itemgetter("name")):
                 status = "✓" if module["active"] else "○"
                 print(f"    {status} {module['name']} (priority: {module['priority']})")
 
@@ -582,40 +993,70 @@ Module content here.
         print("\nTo activate: python cm.py activate <module-name>")
         print("To compile: python cm.py compile")
 
-    def activate(self, module_name: str):
-        """Activate a module"""
-        found = False
-        for module_file in MODULE_DIR.rglob(f"*{module_name}*.md"):
-            content = module_file.read_text()
-            # Update active status
-            content = re.sub(
-                r"^active:\s*\w+", "active: true", content, flags=re.MULTILINE
-            )
-            module_file.write_text(content)
-            print(f"✓ Activated {module_file.stem}")
-            found = True
+    def set_active_flag(self, module_file: Path, value: bool) -> bool:
+        """Rewrite the active flag within a module's frontmatter only
+
+        Returns False, without touching the file, if nothing would change.
+        """
+        data = module_file.read_bytes()
+        line = _ACTIVE_LINES[value]
+        if not data.startswith(b"---"):
+            # No frontmatter yet, so give the module one holding just the flag
+            if value:
+                return False
+            atomic_write(module_file, b"---\n" + line + b"\n---\n" + data)
+            return True
+        match = _CLOSING_RE.search(data, 3)
+        header_end = match.start() if match else len(data)
+        old_header = data[:header_end]
+        # Judge the current state the way compile does: a missing flag means active
+        metadata, _ = self.parse_frontmatter(old_header.decode("utf-8"))
+        if bool(metadata.get("active", True)) == value:
+            return False
+        header = _ACTIVE_RE.sub(line, old_header)
+        metadata, _ = self.parse_frontmatter(header.decode("utf-8"))
+        if bool(metadata.get("active", True)) != value:
+            # Missing, or shadowed by a nested key: add a flag last, where it wins
+            eol = b"\r\n" if b"\r\n" in header else b"\n"
+            content = header.rstrip(b"\r\n")
+            header = content + eol + line + header[len(content) :]
+        atomic_write(module_file, header + data[header_end:])
+        return True
+
+    def _set_active(self, module_name: str, value: bool):
+        """Set the active flag on every module matching module_name"""
+        if value:
+            label, state = "✓ Activated", "✓ {} is already active"
+        else:
+            label, state = "○ Deactivated", "○ {} is already inactive"
+        # Same match as the old "*{module_name}*.md" glob, as a plain substring test.
+        # Collect matches first; rewriting files while scanning can re-yield them.
+        matches = [
+            Path(entry.path)
+            for _, entry in _iter_modules(MODULE_DIR)
+            if module_name in entry.name[:-3]
+        ]
+        changed = False
+        for module_file in matches:
+            # Skip the write so unchanged modules keep their mtime
+            if self.set_active_flag(module_file, value):
+                print(f"{label} {module_file.stem}")
+                changed = True
+            else:
+                print(state.format(module_file.stem))
 
-        if not found:
+        if not matches:
             print(f"Module '{module_name}' not found")
-        else:
+        elif changed:
             print("\nRun 'python cm.py compile' to update CLAUDE.md")
 
+    def activate(self, module_name: str):
+        """Activate a module"""
+        self._set_active(module_name, True)
+
     def deactivate(self, module_name: str):
         """Deactivate a module"""
-        found = False
-        for module_file in MODULE_DIR.rglob(f"*{module_name}*.md"):
-            content = module_file.read_text()
-            content = re.sub(
-                r"^active:\s*\w+", "active: false", content, flags=re.MULTILINE
-            )
-            module_file.write_text(content)
-            print(f"○ Deactivated {module_file.stem}")
-            found = True
-
-        if not found:
-            print(f"Module '{module_name}' not found")
-        else:
-            print("\nRun 'python cm.py compile' to update CLAUDE.md")
+        self._set_active(module_name, False)
 
 
 def main():
@@ -638,7 +1079,7 @@ Claude Module Manager (cm.py) - v{VERSION}
 
 Usage:
     python cm.py init              # Initialize module system
-    python cm.py compile [--output <file>] # Compile to CLAUDE.md, GEMINI.md, etc.
+    python cm.py compile [--output <file>] [--force] # Compile to CLAUDE.md, GEMINI.md, etc.
     python cm.py list              # List available modules
     python cm.py activate <name>   # Activate a module
     python cm.py deactivate <name> # Deactivate a module
@@ -657,7 +1098,7 @@ Usage:
             except IndexError:
                 print("Error: --output flag requires a filename.", file=sys.stderr)
                 sys.exit(1)
-        manager.compile(output_file=output_file)
+        manager.compile(output_file=output_file, force="--force" in args)
     elif args[0] == "list":
         manager.list_modules()
     elif args[0] == "activate" and len(args) > 1:
@@ -671,20 +1112,18 @@ Usage:
 
 if __name__ == "__main__":
     debug("Script started")
-    # Try to use the enhanced version if available
+    # Check for the enhanced version's dependencies without importing them
     try:
-        import click
-        import rich
+        from importlib.util import find_spec
 
-        # If we get here, use the full version from reference
-        print(
-            "Note: Full version with rich UI available. Using simple version for bootstrap."
-        )
-        print("To use full version: uv run cm.py <command>")
-        main()
-    except ImportError:
-        debug("Using simple version (no click/rich)")
-        # Use simple version
+        if find_spec("click") is not None and find_spec("rich") is not None:
+            # If we get here, use the full version from reference
+            print(
+                "Note: Full version with rich UI available. Using simple version for bootstrap."
+            )
+            print("To use full version: uv run cm.py <command>")
+        else:
+            debug("Using simple version (no click/rich)")
         main()
     except Exception as e:
         debug(f"Fatal error: {e}")